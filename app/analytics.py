@@ -0,0 +1,120 @@
+# app/analytics.py
+# Incrementally maintained per-assignment / per-test-case aggregates.
+# Distributions are fixed-size histograms so that percentiles can be read in
+# constant time and a submission's contribution can be added or removed exactly.
+import json
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+SCORE_BUCKETS = 101  # one bucket per whole percent, 0..100
+
+# geometric buckets from 1ms to ~36s (each 25% wider than the last), a
+# catch-all up to 10 minutes (far above any sandbox timeout), then overflow
+EXEC_TIME_BOUNDS = [round(0.001 * 1.25 ** i, 4) for i in range(48)] + [600.0]
+EXEC_TIME_BUCKETS = len(EXEC_TIME_BOUNDS) + 1
+
+
+def load_histogram(raw: Optional[str], size: int) -> List[int]:
+    return json.loads(raw) if raw else [0] * size
+
+
+def dump_histogram(hist: List[int]) -> str:
+    return json.dumps(hist, separators=(",", ":"))
+
+
+def score_percent(earned: float, total: float) -> float:
+    if not total:
+        return 0.0
+    return max(0.0, min(100.0, 100.0 * float(earned or 0.0) / total))
+
+
+def score_bucket(earned: float, total: float) -> int:
+    return int(round(score_percent(earned, total)))
+
+
+def exec_time_bucket(seconds: float) -> int:
+    return bisect_left(EXEC_TIME_BOUNDS, float(seconds or 0.0))
+
+
+def histogram_percentile(hist: List[int], q: float) -> Optional[int]:
+    """Index of the bucket holding the q-quantile (0 < q <= 1), or None if empty."""
+    total = sum(hist)
+    if total == 0:
+        return None
+    target = q * total
+    seen = 0
+    for idx, count in enumerate(hist):
+        seen += count
+        if seen >= target:
+            return idx
+    return len(hist) - 1
+
+
+def exec_time_percentile(hist: List[int], q: float) -> Optional[float]:
+    """
+    Upper bound (seconds) of the bucket holding the q-quantile, so the value
+    never understates. None if empty or if it falls in the unbounded overflow bucket.
+    """
+    idx = histogram_percentile(hist, q)
+    if idx is None or idx >= len(EXEC_TIME_BOUNDS):
+        return None
+    return EXEC_TIME_BOUNDS[idx]
+
+
+def apply_submission(stats, earned: float, total: float, exec_time: float, sign: int = 1) -> None:
+    """Add (sign=1) or remove (sign=-1) one graded submission from AssignmentStats."""
+    scores = load_histogram(stats.score_histogram, SCORE_BUCKETS)
+    times = load_histogram(stats.exec_time_histogram, EXEC_TIME_BUCKETS)
+    scores[score_bucket(earned, total)] += sign
+    times[exec_time_bucket(exec_time)] += sign
+
+    stats.attempts = (stats.attempts or 0) + sign
+    # decided on raw points: the rounded bucket would count 99.5% as full marks
+    full_marks = bool(total) and float(earned or 0.0) >= total
+    stats.full_marks = (stats.full_marks or 0) + (sign if full_marks else 0)
+    stats.score_sum = (stats.score_sum or 0.0) + sign * score_percent(earned, total)
+    stats.exec_time_sum = (stats.exec_time_sum or 0.0) + sign * float(exec_time or 0.0)
+    stats.score_histogram = dump_histogram(scores)
+    stats.exec_time_histogram = dump_histogram(times)
+
+
+def apply_test_result(stats, passed: bool, exec_time: float, sign: int = 1) -> None:
+    """Add (sign=1) or remove (sign=-1) one test outcome from TestCaseStats."""
+    times = load_histogram(stats.exec_time_histogram, EXEC_TIME_BUCKETS)
+    times[exec_time_bucket(exec_time)] += sign
+
+    stats.attempts = (stats.attempts or 0) + sign
+    stats.passes = (stats.passes or 0) + (sign if passed else 0)
+    stats.exec_time_sum = (stats.exec_time_sum or 0.0) + sign * float(exec_time or 0.0)
+    stats.exec_time_histogram = dump_histogram(times)
+
+
+def summarize_assignment(stats) -> Dict:
+    attempts = stats.attempts or 0
+    scores = load_histogram(stats.score_histogram, SCORE_BUCKETS)
+    times = load_histogram(stats.exec_time_histogram, EXEC_TIME_BUCKETS)
+    return {
+        "assignment_id": stats.assignment_id,
+        "attempts": attempts,
+        "pass_rate": round(stats.full_marks / attempts, 4) if attempts else None,
+        "mean_score": round(stats.score_sum / attempts, 3) if attempts else None,
+        "score_percentiles": {
+            f"p{int(q * 100)}": histogram_percentile(scores, q) for q in (0.25, 0.5, 0.75, 0.9)
+        },
+        "score_histogram": scores,
+        "mean_exec_time": round(stats.exec_time_sum / attempts, 4) if attempts else None,
+        "p95_exec_time": exec_time_percentile(times, 0.95),
+    }
+
+
+def summarize_testcase(stats) -> Dict:
+    attempts = stats.attempts or 0
+    times = load_histogram(stats.exec_time_histogram, EXEC_TIME_BUCKETS)
+    return {
+        "test_case_id": stats.test_case_id,
+        "attempts": attempts,
+        "passes": stats.passes or 0,
+        "pass_rate": round(stats.passes / attempts, 4) if attempts else None,
+        "mean_exec_time": round(stats.exec_time_sum / attempts, 4) if attempts else None,
+        "p95_exec_time": exec_time_percentile(times, 0.95),
+    }
@@ -8,5 +8,13 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24
     ALGORITHM: str = "HS256"
     PROJECT_ROOT: str = os.getenv("PROJECT_ROOT", "/app")
+    BLOB_DIR: str = os.getenv("BLOB_DIR", "/app/blobs")
+    RESULT_EXCERPT_CHARS: int = int(os.getenv("RESULT_EXCERPT_CHARS", "512"))
+    # per-sandbox resource limits, also used to size worker concurrency
+    SANDBOX_MEM_LIMIT_MB: int = int(os.getenv("SANDBOX_MEM_LIMIT_MB", "256"))
+    SANDBOX_CPUS: float = float(os.getenv("SANDBOX_CPUS", "1.0"))
+    WORKER_MIN_CONCURRENCY: int = int(os.getenv("WORKER_MIN_CONCURRENCY", "1"))
+    WORKER_MAX_CONCURRENCY: int = int(os.getenv("WORKER_MAX_CONCURRENCY", "0")) # 0 = size from host
+    WORKER_MEM_RESERVE_MB: int = int(os.getenv("WORKER_MEM_RESERVE_MB", "512"))
 
 settings = Settings()
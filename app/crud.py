@@ -0,0 +1,103 @@
+# app/crud.py
+# Synchronous DB helpers used by the Celery worker (see app/tasks.py).
+import json
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from . import analytics, models
+from .db import get_sync_session
+
+
+def get_submission(submission_id: int) -> Optional[models.Submission]:
+    with get_sync_session() as session:
+        return session.get(models.Submission, submission_id)
+
+
+def get_testcases_for_assignment(assignment_id: int) -> List[models.TestCase]:
+    with get_sync_session() as session:
+        result = session.execute(
+            select(models.TestCase)
+            .where(models.TestCase.assignment_id == assignment_id)
+            .order_by(models.TestCase.id)
+        )
+        return result.scalars().all()
+
+
+def get_submissions_for_assignment(assignment_id: int) -> List[models.Submission]:
+    with get_sync_session() as session:
+        result = session.execute(
+            select(models.Submission).where(models.Submission.assignment_id == assignment_id)
+        )
+        return result.scalars().all()
+
+
+def _locked_stats(session, model, key: Dict):
+    """Fetch (creating if needed) a stats row and lock it for this transaction."""
+    # PostgreSQL in production; SQLite (used by the tests) has the same ON CONFLICT API
+    insert = sqlite.insert if session.get_bind().dialect.name == "sqlite" else postgresql.insert
+    session.execute(insert(model.__table__).values(**key).on_conflict_do_nothing())
+    query = select(model).with_for_update()
+    for column, value in key.items():
+        query = query.where(getattr(model, column) == value)
+    return session.execute(query).scalar_one()
+
+
+def _apply_to_stats(session, assignment_id: int, summary: Dict, rows: List[Dict], sign: int) -> None:
+    stats = _locked_stats(session, models.AssignmentStats, {"assignment_id": assignment_id})
+    analytics.apply_submission(stats, summary.get("earned_points", 0.0), summary.get("total_points", 0.0),
+                               summary.get("avg_execution_time", 0.0), sign)
+    # lock in id order so concurrent workers cannot deadlock on each other
+    for row in sorted(rows, key=lambda r: r["test_case_id"]):
+        tc_stats = _locked_stats(session, models.TestCaseStats,
+                                 {"test_case_id": row["test_case_id"], "assignment_id": assignment_id})
+        analytics.apply_test_result(tc_stats, row["passed"], row.get("execution_time"), sign)
+
+
+def _is_final(summary: Dict) -> bool:
+    return summary.get("phase") != "public"
+
+
+def save_evaluation_result(submission_id: int, result: Dict) -> None:
+    """
+    Persist an evaluation: per-test details become test_results rows, the
+    remaining summary is stored compactly in Submission.result_json.
+    Assignment / test case aggregates are updated in the same transaction;
+    on a re-grade the previous result's contribution is removed first, but
+    only if it carries the "counted" marker: results saved before the
+    aggregates existed were never added, so they must not be subtracted.
+    Partial (public-phase) results are stored but neither counted in aggregates
+    nor written to Submission.score / exec_time.
+    """
+    details = result.get("details", [])
+    summary = {k: v for k, v in result.items() if k != "details"}
+
+    with get_sync_session() as session:
+        # lock the submission so overlapping saves cannot both subtract the same previous result
+        submission = session.get(models.Submission, submission_id, with_for_update=True)
+        if submission is None:
+            return
+
+        previous = json.loads(submission.result_json) if submission.result_json else None
+        if previous and previous.get("counted"):
+            previous_rows = session.execute(
+                select(models.TestResult).where(models.TestResult.submission_id == submission_id)
+            ).scalars().all()
+            _apply_to_stats(session, submission.assignment_id, previous,
+                            [{"test_case_id": r.test_case_id, "passed": r.passed,
+                              "execution_time": r.execution_time} for r in previous_rows], -1)
+        if _is_final(summary):
+            _apply_to_stats(session, submission.assignment_id, summary, details, 1)
+            summary["counted"] = True
+
+        # a public-phase score is partial; keep the listed grade until the final one lands
+        if _is_final(summary):
+            submission.score = result.get("earned_points", 0.0)
+            submission.exec_time = result.get("avg_execution_time")
+        submission.result_json = json.dumps(summary, separators=(",", ":"))
+
+        # re-grades replace the previous rows
+        session.execute(delete(models.TestResult).where(models.TestResult.submission_id == submission_id))
+        session.add_all([models.TestResult(submission_id=submission_id, **row) for row in details])
+        session.commit()
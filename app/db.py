@@ -1,3 +1,4 @@
+from sqlalchemy import create_engine
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import settings
@@ -6,7 +7,19 @@ engine = create_async_engine(settings.DATABASE_URL, future=True, echo=False)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 Base = declarative_base()
 
+# Synchronous sessions for the Celery worker, which runs outside an event loop.
+# The psycopg2 engine is bound on first use so API processes never create it.
+SYNC_DATABASE_URL = settings.DATABASE_URL.replace("+asyncpg", "+psycopg2")
+SessionLocal = sessionmaker(expire_on_commit=False)
+
+def get_sync_session():
+    if SessionLocal.kw.get("bind") is None:
+        SessionLocal.configure(bind=create_engine(SYNC_DATABASE_URL, future=True, echo=False))
+    return SessionLocal()
+
 # Dependency
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+get_session = get_db
@@ -5,18 +5,32 @@ import shutil
 import tempfile
 import logging
 
-# prefer docker SDK, but allow subprocess fallback if not available
-try:
-    import docker
-    DOCKER_AVAILABLE = True
-except Exception:
-    DOCKER_AVAILABLE = False
+import importlib.util
+
+# prefer docker SDK, but allow subprocess fallback if not available.
+# The SDK itself is only imported on first use (see get_docker_client).
+DOCKER_AVAILABLE = importlib.util.find_spec("docker") is not None
 
 import subprocess
 from typing import Dict
 
+from ..config import settings
+
 logger = logging.getLogger(__name__)
 
+_client = None
+_client_pid = None
+
+
+def get_docker_client():
+    """Process-wide docker client, created on first use and again after a fork."""
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        import docker
+        _client = docker.from_env()
+        _client_pid = os.getpid()
+    return _client
+
 
 def _run_subprocess(cmd: list, cwd: str, timeout: int):
     """Simple subprocess runner fallback (for local dev)."""
@@ -72,7 +86,7 @@ def run_code_in_docker(language: str, submission_file_path: str, input_file_path
             dst_input = None
 
         if DOCKER_AVAILABLE:
-            client = docker.from_env()
+            client = get_docker_client()
             # Choose image & command based on language
             if language == "python":
                 image = "python:3.10-slim"
@@ -104,7 +118,8 @@ def run_code_in_docker(language: str, submission_file_path: str, input_file_path
                     working_dir="/work",
                     detach=True,
                     network_disabled=True,  # disable network for safety
-                    mem_limit="256m",
+                    mem_limit=f"{settings.SANDBOX_MEM_LIMIT_MB}m",
+                    nano_cpus=int(settings.SANDBOX_CPUS * 1e9),
                 )
                 wait_result = container.wait(timeout=timeout + 2)
                 logs = container.logs(stdout=True, stderr=True).decode(errors="ignore")
@@ -48,9 +48,55 @@ class Submission(Base):
     file_path = Column(String, nullable=False)
     language = Column(String, nullable=False)
     score = Column(Float, default=0.0)
-    result_json = Column(Text) # JSON string of per-test-case results
+    result_json = Column(Text) # compact JSON summary; per-test rows live in test_results
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     exec_time = Column(Float, nullable=True)
 
     assignment = relationship("Assignment", back_populates="submissions")
     student = relationship("User", back_populates="submissions")
+    test_results = relationship("TestResult", back_populates="submission", cascade="all, delete-orphan")
+
+class TestResult(Base):
+    __tablename__ = "test_results"
+    id = Column(Integer, primary_key=True)
+    submission_id = Column(Integer, ForeignKey("submissions.id"), index=True, nullable=False)
+    test_case_id = Column(Integer, ForeignKey("testcases.id"), index=True)
+    status = Column(String, nullable=False)
+    passed = Column(Boolean, default=False)
+    points_awarded = Column(Float, default=0.0)
+    execution_time = Column(Float, nullable=True)
+    stdout_excerpt = Column(Text, nullable=True) # window around the first mismatch
+    stderr_excerpt = Column(Text, nullable=True)
+    stdout_blob = Column(String(64), nullable=True) # sha256 of the full output in the blob store
+    stderr_blob = Column(String(64), nullable=True)
+
+    submission = relationship("Submission", back_populates="test_results")
+
+    @property
+    def stdout_truncated(self):
+        return self.stdout_blob is not None
+
+    @property
+    def stderr_truncated(self):
+        return self.stderr_blob is not None
+
+class AssignmentStats(Base):
+    __tablename__ = "assignment_stats"
+    assignment_id = Column(Integer, ForeignKey("assignments.id"), primary_key=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    full_marks = Column(Integer, default=0, nullable=False)
+    score_sum = Column(Float, default=0.0) # sum of score percents
+    score_histogram = Column(Text) # JSON list: submissions per whole score percent
+    exec_time_sum = Column(Float, default=0.0)
+    exec_time_histogram = Column(Text) # JSON list: counts per analytics.EXEC_TIME_BOUNDS bucket
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class TestCaseStats(Base):
+    __tablename__ = "testcase_stats"
+    test_case_id = Column(Integer, ForeignKey("testcases.id"), primary_key=True)
+    assignment_id = Column(Integer, ForeignKey("assignments.id"), index=True, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    passes = Column(Integer, default=0, nullable=False)
+    exec_time_sum = Column(Float, default=0.0)
+    exec_time_histogram = Column(Text)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,6 +1,8 @@
 # app/routes/analytics_routes.py
 from fastapi import APIRouter, Depends, HTTPException
-from app import utils, crud, auth
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app import analytics, db, models, schemas, utils, auth
 from typing import List
 
 router = APIRouter()
@@ -17,3 +19,33 @@ async def check_plagiarism(assignment_id: int,
         raise HTTPException(status_code=500, detail=str(e))
 
     return {"assignment_id": assignment_id, "flagged_pairs": results}
+
+
+@router.get("/assignments/{assignment_id}/summary", response_model=schemas.AssignmentStatsOut)
+async def assignment_summary(assignment_id: int,
+                             current_user: models.User = Depends(auth.get_current_user),
+                             session: AsyncSession = Depends(db.get_session)):
+    """Score distribution (in percent of total points) and timing, read from the materialized aggregates."""
+    if not current_user.is_instructor:
+        raise HTTPException(status_code=403, detail="Only instructors can view analytics")
+
+    stats = await session.get(models.AssignmentStats, assignment_id)
+    if not stats:
+        raise HTTPException(status_code=404, detail="No graded submissions for this assignment")
+    return analytics.summarize_assignment(stats)
+
+
+@router.get("/assignments/{assignment_id}/testcases", response_model=List[schemas.TestCaseStatsOut])
+async def testcase_summary(assignment_id: int,
+                           current_user: models.User = Depends(auth.get_current_user),
+                           session: AsyncSession = Depends(db.get_session)):
+    """Per-test-case pass rate and timing, hardest test cases first."""
+    if not current_user.is_instructor:
+        raise HTTPException(status_code=403, detail="Only instructors can view analytics")
+
+    result = await session.execute(
+        select(models.TestCaseStats).where(models.TestCaseStats.assignment_id == assignment_id)
+    )
+    summaries = [analytics.summarize_testcase(stats) for stats in result.scalars().all()]
+    summaries.sort(key=lambda s: (s["pass_rate"] is None, s["pass_rate"] or 0.0))
+    return summaries
@@ -1,7 +1,9 @@
 # app/routes/student_routes.py
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from app import db, models, schemas, auth
+from sqlalchemy.future import select
+from app import db, models, schemas, auth, blobstore
 import os, aiofiles
 from datetime import datetime
 
@@ -35,3 +37,68 @@ async def submit_assignment(assignment_id: int,
     session.add(submission)
     await session.commit()
     return {"message": "Submission uploaded successfully"}
+
+
+async def _get_visible_submission(submission_id: int, current_user: models.User, session: AsyncSession):
+    submission = await session.get(models.Submission, submission_id)
+    if not submission:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    if submission.student_id != current_user.id and not current_user.is_instructor:
+        raise HTTPException(status_code=403, detail="Not allowed to view this submission")
+    return submission
+
+
+@router.get("/submissions/{submission_id}/results", response_model=list[schemas.TestResultOut])
+async def get_submission_results(submission_id: int,
+                                 current_user: models.User = Depends(auth.get_current_user),
+                                 session: AsyncSession = Depends(db.get_session)):
+    await _get_visible_submission(submission_id, current_user, session)
+    result = await session.execute(
+        select(models.TestResult, models.TestCase.is_public)
+        .join(models.TestCase, models.TestCase.id == models.TestResult.test_case_id)
+        .where(models.TestResult.submission_id == submission_id)
+        .order_by(models.TestResult.test_case_id)
+    )
+
+    results = []
+    for row, is_public in result.all():
+        out = schemas.TestResultOut.from_orm(row)
+        if not is_public and not current_user.is_instructor:
+            # hidden tests: students only see the outcome, never the output
+            out = out.copy(update={"stdout_excerpt": None, "stderr_excerpt": None,
+                                   "stdout_truncated": False, "stderr_truncated": False})
+        results.append(out)
+    return results
+
+
+@router.get("/submissions/{submission_id}/results/{test_case_id}/{stream}", response_class=PlainTextResponse)
+async def get_full_output(submission_id: int, test_case_id: int, stream: str,
+                          current_user: models.User = Depends(auth.get_current_user),
+                          session: AsyncSession = Depends(db.get_session)):
+    if stream not in ("stdout", "stderr"):
+        raise HTTPException(status_code=404, detail="Unknown output stream")
+    await _get_visible_submission(submission_id, current_user, session)
+
+    result = await session.execute(
+        select(models.TestResult, models.TestCase.is_public)
+        .join(models.TestCase, models.TestCase.id == models.TestResult.test_case_id)
+        .where(
+            models.TestResult.submission_id == submission_id,
+            models.TestResult.test_case_id == test_case_id,
+        )
+    )
+    found = result.first()
+    if not found:
+        raise HTTPException(status_code=404, detail="Test result not found")
+    row, is_public = found
+    if not is_public and not current_user.is_instructor:
+        raise HTTPException(status_code=403, detail="Output of hidden test cases is not available")
+
+    digest = getattr(row, f"{stream}_blob")
+    if digest is None:
+        # output was short enough to be stored in full as the excerpt
+        return getattr(row, f"{stream}_excerpt") or ""
+    content = blobstore.get_blob(digest)
+    if content is None:
+        raise HTTPException(status_code=410, detail="Full output is no longer available")
+    return content
@@ -52,3 +52,34 @@ class SubmissionOut(BaseModel):
     result_json: Optional[str]
     class Config:
         orm_mode = True
+
+class TestResultOut(BaseModel):
+    test_case_id: int
+    status: str
+    passed: bool
+    points_awarded: float
+    execution_time: Optional[float]
+    stdout_excerpt: Optional[str]
+    stderr_excerpt: Optional[str]
+    stdout_truncated: bool = False
+    stderr_truncated: bool = False
+    class Config:
+        orm_mode = True
+
+class AssignmentStatsOut(BaseModel):
+    assignment_id: int
+    attempts: int
+    pass_rate: Optional[float]
+    mean_score: Optional[float]
+    score_percentiles: Dict[str, Optional[int]]
+    score_histogram: List[int]
+    mean_exec_time: Optional[float]
+    p95_exec_time: Optional[float]
+
+class TestCaseStatsOut(BaseModel):
+    test_case_id: int
+    attempts: int
+    passes: int
+    pass_rate: Optional[float]
+    mean_exec_time: Optional[float]
+    p95_exec_time: Optional[float]
@@ -5,8 +5,10 @@ import logging
 from celery import Celery
 from typing import List
 
+from .config import settings
+from .blobstore import put_blob
 from .executor.docker_runner import run_code_in_docker
-from .utils import compare_outputs, detect_plagiarism_for_assignment
+from .utils import compare_outputs, diff_excerpt
 
 # --- Celery config (reads env, fallback defaults) ---
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
@@ -14,6 +16,15 @@ CELERY_BACKEND = os.getenv("CELERY_BACKEND", "redis://redis:6379/1")
 
 celery = Celery("tasks", broker=CELERY_BROKER_URL, backend=CELERY_BACKEND)
 celery.conf.task_annotations = {"*": {"rate_limit": "10/s"}}
+# Redis emulates priorities with one list per step; 0 is served first.
+celery.conf.broker_transport_options = {
+    "queue_order_strategy": "priority",
+    "priority_steps": [0, 3, 6, 9],
+    "sep": ":",
+}
+
+PRIORITY_PUBLIC = 0
+PRIORITY_HIDDEN = 9
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +32,7 @@ logger = logging.getLogger(__name__)
 # NOTE: Integrate with your app.crud functions
 # Expected crud functions in your repo:
 # - crud.get_submission(submission_id) -> returns object with file_path, language, assignment_id, student_id
-# - crud.get_testcases_for_assignment(assignment_id) -> returns list of testcases with input_path, expected_output_path, points
+# - crud.get_testcases_for_assignment(assignment_id) -> returns list of testcases with input_path, expected_output_path, points, is_public
 # - crud.save_evaluation_result(submission_id, result_dict) -> store result and status
 
 # We'll import crud relatively; backend team should implement these functions.
@@ -32,98 +43,161 @@ except Exception:
     logger.warning("Could not import crud module. You must wire DB integration.")
 
 
-@celery.task(bind=True)
-def evaluate_submission_task(self, submission_id: int):
+def _store_blob(data: str):
+    """put_blob, but a blob store failure only loses the full output, not the grade."""
+    try:
+        return put_blob(data)
+    except OSError:
+        logger.exception("Could not store full output in blob store")
+        return None
+
+
+def _compact_result(test_case_id, status, passed, stdout, stderr, expected, exec_time, points_awarded):
     """
-    Celery task that grades a submission end-to-end.
+    Build the stored row for one test: short excerpts inline, full outputs
+    offloaded to the blob store only when the excerpt had to truncate them.
     """
-    if crud is None:
-        # For demo/dev: submission_id can be treated as a file path string
-        # Return a helpful error for integration
-        return {"status": "error", "message": "crud module not available; integrate with backend CRUD."}
+    width = settings.RESULT_EXCERPT_CHARS
+    stdout_excerpt = diff_excerpt(stdout, expected, width)
+    stderr_excerpt = diff_excerpt(stderr, "", width)
+    return {
+        "test_case_id": test_case_id,
+        "status": status,
+        "passed": passed,
+        "stdout_excerpt": stdout_excerpt,
+        "stderr_excerpt": stderr_excerpt,
+        "stdout_blob": _store_blob(stdout) if stdout_excerpt != stdout else None,
+        "stderr_blob": _store_blob(stderr) if stderr_excerpt != stderr else None,
+        "execution_time": exec_time,
+        "points_awarded": points_awarded,
+    }
 
-    submission = crud.get_submission(submission_id)
-    if not submission:
-        return {"status": "error", "message": "submission not found"}
-
-    assignment_id = submission.assignment_id
-    testcases = crud.get_testcases_for_assignment(assignment_id)
-    results = []
-    total_points = 0
-    earned_points = 0
-    total_time = 0.0
-
-    for tc in testcases:
-        input_path = tc.input_path
-        expected_out_path = tc.expected_output_path
-        points = tc.points or 0
-        total_points += points
-
-        # run inside docker
-        run_res = run_code_in_docker(submission.language, submission.file_path, input_path, timeout=tc.timeout or 3)
-
-        if run_res.get("status") == "timeout":
-            passed = False
-            stdout = ""
-            stderr = "timeout"
-        elif run_res.get("status") == "runtime_error":
-            passed = False
-            stdout = run_res.get("stdout", "")
-            stderr = run_res.get("stderr", run_res.get("message", "runtime error"))
-        elif run_res.get("status") == "success":
-            stdout = run_res.get("stdout", "")
-            stderr = run_res.get("stderr", "")
-            # read expected output
-            if os.path.exists(expected_out_path):
-                expected = open(expected_out_path).read()
-            else:
-                expected = ""
-            passed = compare_outputs(stdout, expected)
+
+def _grade_testcase(submission, tc) -> dict:
+    """Run one test case in the sandbox and return its compact result row."""
+    input_path = tc.input_path
+    expected_out_path = tc.expected_output_path
+    points = tc.points or 0
+
+    # run inside docker
+    run_res = run_code_in_docker(submission.language, submission.file_path, input_path, timeout=getattr(tc, "timeout", None) or 3)
+    expected = ""
+
+    if run_res.get("status") == "timeout":
+        passed = False
+        stdout = ""
+        stderr = "timeout"
+    elif run_res.get("status") == "runtime_error":
+        passed = False
+        stdout = run_res.get("stdout", "")
+        stderr = run_res.get("stderr", run_res.get("message", "runtime error"))
+    elif run_res.get("status") == "success":
+        stdout = run_res.get("stdout", "")
+        stderr = run_res.get("stderr", "")
+        # read expected output
+        if os.path.exists(expected_out_path):
+            expected = open(expected_out_path).read()
         else:
-            passed = False
-            stdout = run_res.get("stdout", "")
-            stderr = run_res.get("stderr", run_res.get("message", "error"))
-
-        if passed:
-            earned_points += points
-
-        exec_time = run_res.get("execution_time", 0.0)
-        total_time += float(exec_time or 0.0)
-
-        results.append({
-            "test_case_id": tc.id,
-            "passed": passed,
-            "stdout": stdout,
-            "stderr": stderr,
-            "execution_time": exec_time,
-            "points_awarded": points if passed else 0,
-        })
-
-    avg_time = total_time / max(1, len(testcases))
-
-    eval_summary = {
-        "submission_id": submission_id,
-        "assignment_id": assignment_id,
+            expected = ""
+        passed = compare_outputs(stdout, expected)
+    else:
+        passed = False
+        stdout = run_res.get("stdout", "")
+        stderr = run_res.get("stderr", run_res.get("message", "error"))
+
+    exec_time = run_res.get("execution_time", 0.0)
+    return _compact_result(tc.id, run_res.get("status", "error"), passed, stdout, stderr, expected,
+                           exec_time, points if passed else 0)
+
+
+def _build_summary(submission, results: List[dict], total_points: float, phase: str, pending_tests: int = 0) -> dict:
+    earned_points = sum(r["points_awarded"] for r in results)
+    total_time = sum(float(r["execution_time"] or 0.0) for r in results)
+    avg_time = total_time / max(1, len(results))
+
+    return {
+        "submission_id": submission.id,
+        "assignment_id": submission.assignment_id,
         "student_id": submission.student_id,
+        "phase": phase,  # "public" while hidden tests are still pending, then "complete"
+        "pending_tests": pending_tests,
         "total_points": total_points,
         "earned_points": earned_points,
         "avg_execution_time": round(avg_time, 3),
         "details": results,
     }
 
-    # Save result in DB
+
+def _save(submission_id: int, eval_summary: dict, reraise: bool = False) -> None:
     try:
         crud.save_evaluation_result(submission_id, eval_summary)
     except Exception as e:
         logger.exception("Failed to save evaluation result: %s", e)
+        if reraise:
+            raise
 
-    # Optional: run plagiarism detection for the whole assignment and save flags
-    try:
-        plagiarism_flags = detect_plagiarism_for_assignment(assignment_id)
-        if plagiarism_flags:
-            crud.save_plagiarism_flags(assignment_id, plagiarism_flags)
-            eval_summary["plagiarism_flags"] = plagiarism_flags
-    except Exception:
-        logger.exception("Plagiarism check failed")
 
+def _load(submission_id: int):
+    """Fetch the submission and its test cases, or return an error dict."""
+    if crud is None:
+        # For demo/dev: submission_id can be treated as a file path string
+        # Return a helpful error for integration
+        return None, None, {"status": "error", "message": "crud module not available; integrate with backend CRUD."}
+
+    submission = crud.get_submission(submission_id)
+    if not submission:
+        return None, None, {"status": "error", "message": "submission not found"}
+    return submission, crud.get_testcases_for_assignment(submission.assignment_id), None
+
+
+def _finish(submission, results: List[dict], total_points: float, reraise: bool = False) -> dict:
+    eval_summary = _build_summary(submission, results, total_points, phase="complete")
+    _save(submission.id, eval_summary, reraise=reraise)
+    # plagiarism is checked on demand via /analytics/plagiarism, not per grade:
+    # the assignment-wide scan is O(n^2) in submissions
     return eval_summary
+
+
+@celery.task(bind=True, priority=PRIORITY_PUBLIC)
+def evaluate_submission_task(self, submission_id: int):
+    """
+    Celery task that grades a submission, public test cases first.
+    Public results are saved straight away (phase "public") so students get
+    early feedback; hidden test cases continue in evaluate_hidden_tests_task
+    at lower priority. Without hidden tests this grades end-to-end.
+    """
+    submission, testcases, error = _load(submission_id)
+    if error:
+        return error
+
+    total_points = sum(tc.points or 0 for tc in testcases)
+    hidden = [tc for tc in testcases if not tc.is_public]
+    results = [_grade_testcase(submission, tc) for tc in testcases if tc.is_public]
+
+    if not hidden:
+        return _finish(submission, results, total_points)
+
+    eval_summary = _build_summary(submission, results, total_points, phase="public", pending_tests=len(hidden))
+    if results:
+        _save(submission_id, eval_summary)
+    evaluate_hidden_tests_task.apply_async((submission_id, results), priority=PRIORITY_HIDDEN)
+    return eval_summary
+
+
+@celery.task(bind=True, priority=PRIORITY_HIDDEN, acks_late=True, reject_on_worker_lost=True,
+             autoretry_for=(Exception,), retry_backoff=True, max_retries=5)
+def evaluate_hidden_tests_task(self, submission_id: int, public_results: List[dict]):
+    """
+    Second grading phase: runs the hidden test cases and saves the complete
+    result, merged with the public results from evaluate_submission_task.
+    Acked only after it finishes (and retried on errors) so the final grade
+    cannot silently go missing once the partial result has been published.
+    """
+    submission, testcases, error = _load(submission_id)
+    if error:
+        return error
+
+    total_points = sum(tc.points or 0 for tc in testcases)
+    results = list(public_results) + [_grade_testcase(submission, tc) for tc in testcases if not tc.is_public]
+    # let a failed final save raise so autoretry runs it again
+    return _finish(submission, results, total_points, reraise=True)
@@ -1,5 +1,6 @@
 # app/utils.py
-import difflib
+# difflib is imported inside the plagiarism helpers: the API and the grading
+# path import this module but rarely need it.
 import ast
 import os
 from typing import List, Dict
@@ -17,6 +18,29 @@ def compare_outputs(student_output: str, expected_output: str) -> bool:
     return student_output.strip() == expected_output.strip()
 
 
+def diff_excerpt(actual: str, expected: str = "", width: int = 512) -> str:
+    """
+    Return at most `width` chars of `actual` (including "..." markers where it
+    was cut), centred on its first divergence from `expected`.
+    With no expected output (e.g. stderr) this is just the head of `actual`.
+    """
+    actual = actual or ""
+    if len(actual) <= width:
+        return actual
+    if width <= 6:
+        return actual[:width]
+    mismatch = len(os.path.commonprefix([actual, expected or ""]))
+    body = width - 6  # leave room for the leading / trailing "..." markers
+    start = max(0, min(mismatch - body // 2, len(actual) - body))
+    end = start + body
+    excerpt = actual[start:end]
+    if start > 0:
+        excerpt = "..." + excerpt
+    if end < len(actual):
+        excerpt = excerpt + "..."
+    return excerpt
+
+
 # --- Plagiarism / similarity helpers ---
 
 
@@ -66,6 +90,8 @@ def similarity_ratio_code(code_a: str, code_b: str, language: str = "python") ->
     Returns a 0..1 similarity ratio between two code strings.
     For Python, apply normalization. For other languages we fall back to raw difflib ratio.
     """
+    import difflib
+
     if language == "python":
         a = _normalize_python_source(code_a)
         b = _normalize_python_source(code_b)
@@ -0,0 +1,94 @@
+# tests/test_analytics.py
+from types import SimpleNamespace
+
+from app import analytics
+
+
+def _assignment_stats():
+    return SimpleNamespace(assignment_id=1, attempts=0, full_marks=0, score_sum=0.0, score_histogram=None,
+                           exec_time_sum=0.0, exec_time_histogram=None)
+
+
+def _testcase_stats():
+    return SimpleNamespace(test_case_id=1, attempts=0, passes=0, exec_time_sum=0.0, exec_time_histogram=None)
+
+
+def test_submission_add_then_remove_returns_to_empty():
+    stats = _assignment_stats()
+    analytics.apply_submission(stats, 7, 10, 0.25)
+    analytics.apply_submission(stats, 10, 10, 1.5)
+    analytics.apply_submission(stats, 7, 10, 0.25, sign=-1)
+    analytics.apply_submission(stats, 10, 10, 1.5, sign=-1)
+
+    assert stats.attempts == 0
+    assert stats.full_marks == 0
+    assert abs(stats.score_sum) < 1e-9
+    assert abs(stats.exec_time_sum) < 1e-9
+    assert set(analytics.load_histogram(stats.score_histogram, analytics.SCORE_BUCKETS)) == {0}
+    assert set(analytics.load_histogram(stats.exec_time_histogram, analytics.EXEC_TIME_BUCKETS)) == {0}
+
+
+def test_test_result_add_then_remove_returns_to_empty():
+    stats = _testcase_stats()
+    analytics.apply_test_result(stats, True, 0.2)
+    analytics.apply_test_result(stats, False, 3.0)
+    analytics.apply_test_result(stats, True, 0.2, sign=-1)
+    analytics.apply_test_result(stats, False, 3.0, sign=-1)
+
+    assert (stats.attempts, stats.passes) == (0, 0)
+    assert set(analytics.load_histogram(stats.exec_time_histogram, analytics.EXEC_TIME_BUCKETS)) == {0}
+
+
+def test_full_marks_uses_raw_points_not_rounded_bucket():
+    stats = _assignment_stats()
+    analytics.apply_submission(stats, 299, 300, 0.1)
+    assert analytics.score_bucket(299, 300) == 100
+    assert stats.full_marks == 0
+
+    analytics.apply_submission(stats, 300, 300, 0.1)
+    assert stats.full_marks == 1
+    assert analytics.summarize_assignment(stats)["pass_rate"] == 0.5
+
+
+def test_mean_score_is_in_percent():
+    stats = _assignment_stats()
+    analytics.apply_submission(stats, 3, 4, 0.1)
+    analytics.apply_submission(stats, 10, 20, 0.1)
+    summary = analytics.summarize_assignment(stats)
+    assert summary["mean_score"] == 62.5
+    assert summary["score_percentiles"]["p90"] == 75
+
+
+def test_score_without_total_points_lands_in_zero_bucket():
+    assert analytics.score_bucket(5, 0) == 0
+    assert analytics.score_percent(5, 0) == 0.0
+
+
+def test_percentiles_of_empty_histogram_are_none():
+    stats = _assignment_stats()
+    summary = analytics.summarize_assignment(stats)
+    assert summary["pass_rate"] is None
+    assert summary["p95_exec_time"] is None
+    assert all(value is None for value in summary["score_percentiles"].values())
+
+
+def test_histogram_percentile_boundaries():
+    hist = [1, 0, 2, 1]
+    assert analytics.histogram_percentile(hist, 0.25) == 0
+    assert analytics.histogram_percentile(hist, 0.5) == 2
+    assert analytics.histogram_percentile(hist, 0.75) == 2
+    assert analytics.histogram_percentile(hist, 1.0) == 3
+
+
+def test_exec_time_percentile_never_understates():
+    for seconds in (0.0005, 0.003, 0.5, 2.0, 35.0, 100.0):
+        hist = [0] * analytics.EXEC_TIME_BUCKETS
+        hist[analytics.exec_time_bucket(seconds)] += 1
+        assert analytics.exec_time_percentile(hist, 0.95) >= seconds
+
+
+def test_exec_time_percentile_overflow_is_none():
+    hist = [0] * analytics.EXEC_TIME_BUCKETS
+    hist[analytics.exec_time_bucket(10_000)] += 1
+    assert analytics.exec_time_bucket(10_000) == analytics.EXEC_TIME_BUCKETS - 1
+    assert analytics.exec_time_percentile(hist, 0.95) is None
@@ -0,0 +1,116 @@
+# tests/test_crud.py
+import json
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("pydantic")
+pytest.importorskip("asyncpg")  # app.db builds the API's async engine at import
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.pool import StaticPool
+
+from app import crud, db, models
+
+
+@pytest.fixture
+def session(monkeypatch):
+    engine = create_engine("sqlite://", future=True, poolclass=StaticPool,
+                           connect_args={"check_same_thread": False})
+    db.Base.metadata.create_all(engine)
+    monkeypatch.setitem(db.SessionLocal.kw, "bind", engine)
+    with db.SessionLocal() as s:
+        yield s
+
+
+@pytest.fixture
+def submission_id(session):
+    assignment = models.Assignment(title="sum", language="python")
+    session.add(assignment)
+    session.flush()
+    session.add_all([
+        models.TestCase(id=1, assignment_id=assignment.id, input_path="in1", expected_output_path="out1",
+                        points=1.0, is_public=True),
+        models.TestCase(id=2, assignment_id=assignment.id, input_path="in2", expected_output_path="out2",
+                        points=1.0, is_public=False),
+    ])
+    submission = models.Submission(assignment_id=assignment.id, file_path="sol.py", language="python")
+    session.add(submission)
+    session.commit()
+    return submission.id
+
+
+def _row(test_case_id, passed, exec_time=0.1):
+    return {
+        "test_case_id": test_case_id,
+        "status": "success",
+        "passed": passed,
+        "stdout_excerpt": "",
+        "stderr_excerpt": "",
+        "stdout_blob": None,
+        "stderr_blob": None,
+        "execution_time": exec_time,
+        "points_awarded": 1.0 if passed else 0,
+    }
+
+
+def _result(submission_id, phase, rows, pending_tests=0):
+    return {
+        "submission_id": submission_id,
+        "phase": phase,
+        "pending_tests": pending_tests,
+        "total_points": 2.0,
+        "earned_points": sum(r["points_awarded"] for r in rows),
+        "avg_execution_time": 0.1,
+        "details": rows,
+    }
+
+
+def _state(session, submission_id):
+    session.expire_all()
+    submission = session.get(models.Submission, submission_id)
+    stats = session.get(models.AssignmentStats, submission.assignment_id)
+    tc_stats = {s.test_case_id: s for s in session.execute(select(models.TestCaseStats)).scalars()}
+    return submission, stats, tc_stats
+
+
+def test_public_phase_leaves_score_and_aggregates_untouched(session, submission_id):
+    crud.save_evaluation_result(submission_id, _result(submission_id, "public", [_row(1, True)], pending_tests=1))
+
+    submission, stats, tc_stats = _state(session, submission_id)
+    assert submission.score == 0.0
+    assert submission.exec_time is None
+    assert stats is None and tc_stats == {}
+    assert json.loads(submission.result_json)["phase"] == "public"
+    assert len(submission.test_results) == 1
+
+
+def test_complete_phase_after_public_is_counted_once(session, submission_id):
+    crud.save_evaluation_result(submission_id, _result(submission_id, "public", [_row(1, True)], pending_tests=1))
+    crud.save_evaluation_result(submission_id, _result(submission_id, "complete", [_row(1, True), _row(2, True)]))
+
+    submission, stats, tc_stats = _state(session, submission_id)
+    assert submission.score == 2.0
+    assert (stats.attempts, stats.full_marks) == (1, 1)
+    assert {k: (v.attempts, v.passes) for k, v in tc_stats.items()} == {1: (1, 1), 2: (1, 1)}
+
+    # a re-grade replaces the previous contribution instead of adding to it
+    crud.save_evaluation_result(submission_id, _result(submission_id, "public", [_row(1, True)], pending_tests=1))
+    crud.save_evaluation_result(submission_id, _result(submission_id, "complete", [_row(1, True), _row(2, False)]))
+
+    submission, stats, tc_stats = _state(session, submission_id)
+    assert submission.score == 1.0
+    assert (stats.attempts, stats.full_marks, stats.score_sum) == (1, 0, 50.0)
+    assert {k: (v.attempts, v.passes) for k, v in tc_stats.items()} == {1: (1, 1), 2: (1, 0)}
+
+
+def test_result_saved_before_aggregates_is_not_subtracted(session, submission_id):
+    submission = session.get(models.Submission, submission_id)
+    submission.result_json = json.dumps({"total_points": 2.0, "earned_points": 2.0, "avg_execution_time": 0.1})
+    session.commit()
+
+    crud.save_evaluation_result(submission_id, _result(submission_id, "complete", [_row(1, True), _row(2, True)]))
+
+    _, stats, tc_stats = _state(session, submission_id)
+    assert (stats.attempts, stats.full_marks) == (1, 1)
+    assert all(v.attempts == 1 for v in tc_stats.values())
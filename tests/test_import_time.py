@@ -0,0 +1,55 @@
+# tests/test_import_time.py
+# Startup budget: every API / worker replica pays these imports on cold start.
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# seconds; override on slow CI hosts rather than loosening the checks
+API_IMPORT_BUDGET = float(os.getenv("API_IMPORT_BUDGET", "2.0"))
+TASKS_IMPORT_BUDGET = float(os.getenv("TASKS_IMPORT_BUDGET", "2.0"))
+
+
+def _python(*args):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def _cumulative_import_us(importtime_log: str, module: str) -> int:
+    # lines look like: "import time:  self [us] | cumulative | imported package"
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = [f.strip() for f in line[len("import time:"):].split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1])
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+
+def _import_seconds(module: str) -> float:
+    # warm up first: measure a deployed replica (bytecode cached), not the first-ever compile
+    _python("-c", f"import {module}")
+    proc = _python("-X", "importtime", "-c", f"import {module}")
+    return _cumulative_import_us(proc.stderr, module) / 1e6
+
+
+def test_api_import_within_budget():
+    pytest.importorskip("fastapi")
+    seconds = _import_seconds("app.main")
+    assert seconds < API_IMPORT_BUDGET, f"import app.main took {seconds:.2f}s (budget {API_IMPORT_BUDGET}s)"
+
+
+def test_tasks_import_within_budget():
+    pytest.importorskip("celery")
+    seconds = _import_seconds("app.tasks")
+    assert seconds < TASKS_IMPORT_BUDGET, f"import app.tasks took {seconds:.2f}s (budget {TASKS_IMPORT_BUDGET}s)"
+
+
+def test_tasks_import_defers_heavy_modules():
+    pytest.importorskip("celery")
+    proc = _python("-c", "import sys, app.tasks; print(sorted(m for m in ('docker', 'difflib') if m in sys.modules))")
+    assert proc.stdout.strip() == "[]"
@@ -0,0 +1,56 @@
+# tests/test_utils.py
+from app.utils import compare_outputs, diff_excerpt
+
+
+def test_compare_outputs_ignores_surrounding_whitespace():
+    assert compare_outputs("42\n", "42")
+    assert not compare_outputs("41", "42")
+    assert compare_outputs(None, "")
+
+
+def test_short_output_is_returned_unchanged():
+    assert diff_excerpt("hello", "world", width=10) == "hello"
+    assert diff_excerpt(None, "x") == ""
+
+
+def test_excerpt_is_centred_on_first_mismatch():
+    expected = "a" * 1000 + "b" * 1000
+    actual = "a" * 1000 + "X" + "b" * 999
+    excerpt = diff_excerpt(actual, expected, width=100)
+
+    assert excerpt.startswith("...") and excerpt.endswith("...")
+    assert len(excerpt) <= 100
+    body = excerpt[3:-3]
+    assert "X" in body
+    # mismatch sits in the middle of the window
+    assert abs(body.index("X") - len(body) // 2) <= 1
+
+
+def test_mismatch_near_start_has_no_leading_marker():
+    actual = "X" + "a" * 999
+    excerpt = diff_excerpt(actual, "a" * 1000, width=50)
+    assert excerpt.startswith("X")
+    assert excerpt.endswith("...")
+    assert len(excerpt) <= 50
+
+
+def test_mismatch_near_end_has_no_trailing_marker():
+    actual = "a" * 999 + "X"
+    excerpt = diff_excerpt(actual, "a" * 1000, width=50)
+    assert excerpt.startswith("...")
+    assert excerpt.endswith("X")
+    assert len(excerpt) <= 50
+
+
+def test_no_expected_output_gives_head():
+    stderr = "Traceback" + "x" * 1000
+    excerpt = diff_excerpt(stderr, "", width=40)
+    assert excerpt.startswith("Traceback")
+    assert len(excerpt) <= 40
+
+
+def test_excerpt_never_exceeds_width():
+    expected = "a" * 3000
+    for length in range(0, 3000, 37):
+        actual = "a" * length + "Z" * 50
+        assert len(diff_excerpt(actual, expected, width=512)) <= 512
@@ -0,0 +1,192 @@
+# worker/autoscale.py
+# Sizes grading concurrency from host resources and scales it with Redis queue depth.
+import os
+import json
+import time
+import logging
+from typing import Dict, Optional
+
+from celery.worker import state
+from celery.worker.autoscale import Autoscaler
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+DECISION_KEY = "instagrade:autoscaler:{hostname}"
+DECISION_TTL = 60  # seconds; stale entries disappear when a worker dies
+# maybe_scale also runs on the consumer loop for every task message, so broker
+# and host reads are sampled at most this often (seconds), and so are writes
+SAMPLE_INTERVAL = 2.0
+
+
+def available_memory_mb() -> Optional[int]:
+    """MemAvailable from /proc/meminfo, falling back to sysconf on non-Linux hosts."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def host_sizing() -> Dict:
+    """
+    Upper bound on concurrent sandboxes this host can run: limited by cores
+    (SANDBOX_CPUS each) and available memory (SANDBOX_MEM_LIMIT_MB each,
+    minus WORKER_MEM_RESERVE_MB for the worker itself).
+    """
+    cpus = os.cpu_count() or 1
+    mem_mb = available_memory_mb()
+    by_cpu = max(1, int(cpus / max(settings.SANDBOX_CPUS, 0.1)))
+    by_mem = by_cpu if mem_mb is None else max(1, (mem_mb - settings.WORKER_MEM_RESERVE_MB) // settings.SANDBOX_MEM_LIMIT_MB)
+
+    max_concurrency = min(by_cpu, by_mem)
+    if settings.WORKER_MAX_CONCURRENCY > 0:
+        max_concurrency = min(max_concurrency, settings.WORKER_MAX_CONCURRENCY)
+    min_concurrency = max(1, min(settings.WORKER_MIN_CONCURRENCY, max_concurrency))
+    return {
+        "cpus": cpus,
+        "mem_available_mb": mem_mb,
+        "limit_by_cpu": by_cpu,
+        "limit_by_mem": by_mem,
+        "max_concurrency": max_concurrency,
+        "min_concurrency": min_concurrency,
+    }
+
+
+def host_saturated(cpus: int, mem_mb: Optional[int]) -> bool:
+    """True when starting one more sandbox would overcommit CPU or memory."""
+    try:
+        load1 = os.getloadavg()[0]
+    except OSError:
+        load1 = 0.0
+    if load1 >= cpus:
+        return True
+    return mem_mb is not None and mem_mb < settings.SANDBOX_MEM_LIMIT_MB + settings.WORKER_MEM_RESERVE_MB
+
+
+class QueueDepthAutoscaler(Autoscaler):
+    """
+    Celery autoscaler that targets `active + queued` processes instead of the
+    default reserved-request count, and applies backpressure when the host is
+    saturated: it stops growing, drops idle processes and holds prefetch at 1.
+    Each decision is published to Redis (DECISION_KEY) and logged on change.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._redis = None
+        self._last_decision = None
+        self._written_decision = None
+        self._sample = None
+        self._sampled_at = 0.0
+        self._published_at = 0.0
+
+    def _broker(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(self.worker.app.conf.broker_url)
+        return self._redis
+
+    def _queue_depth(self) -> int:
+        conf = self.worker.app.conf
+        queue = conf.task_default_queue or "celery"
+        # with Redis priorities each step after the first lives in its own list
+        options = conf.broker_transport_options or {}
+        sep = options.get("sep", "\x06\x16")
+        keys = [queue] + [f"{queue}{sep}{step}" for step in options.get("priority_steps", [0])[1:]]
+        try:
+            pipe = self._broker().pipeline()
+            for key in keys:
+                pipe.llen(key)
+            return sum(int(n) for n in pipe.execute())
+        except Exception:
+            logger.exception("Could not read queue depth")
+            return 0
+
+    def _sample_load(self):
+        """(queue depth, available memory MB, saturated), refreshed every SAMPLE_INTERVAL."""
+        now = time.monotonic()
+        if self._sample is None or now - self._sampled_at >= SAMPLE_INTERVAL:
+            mem_mb = available_memory_mb()
+            self._sample = (self._queue_depth(), mem_mb, host_saturated(os.cpu_count() or 1, mem_mb))
+            self._sampled_at = now
+        return self._sample
+
+    def _set_prefetch(self, count: int) -> Optional[int]:
+        """
+        Move the consumer's prefetch towards `count` and return the resulting value.
+        Compares against the live qos.value (celery's own scale_up/scale_down
+        adjust it too) and only changes it "eventually": the consumer thread
+        applies the new value on its next loop iteration.
+        """
+        qos = getattr(getattr(self.worker, "consumer", None), "qos", None)
+        if qos is None:
+            return None
+        delta = count - qos.value
+        if delta > 0:
+            qos.increment_eventually(delta)
+        elif delta < 0:
+            qos.decrement_eventually(-delta)
+        return qos.value
+
+    def _publish(self, decision: Dict) -> None:
+        """Log changed decisions; write to Redis only when changed (rate-limited) or to refresh the TTL."""
+        now = time.monotonic()
+        comparable = {k: v for k, v in decision.items() if k != "updated_at"}
+        changed = comparable != self._last_decision
+        if changed:
+            logger.info("autoscale decision: %s", json.dumps(decision))
+            self._last_decision = comparable
+        since_write = now - self._published_at
+        unwritten = comparable != self._written_decision
+        if not (unwritten and since_write >= SAMPLE_INTERVAL) and since_write < DECISION_TTL / 2:
+            return
+        self._published_at = now
+        self._written_decision = comparable
+        try:
+            key = DECISION_KEY.format(hostname=self.worker.hostname)
+            self._broker().set(key, json.dumps(decision), ex=DECISION_TTL)
+        except Exception:
+            logger.exception("Could not publish autoscale decision")
+
+    def _maybe_scale(self, req=None):
+        procs = self.processes
+        active = len(state.active_requests)
+        depth, mem_mb, saturated = self._sample_load()
+
+        target = max(self.min_concurrency, min(self.max_concurrency, active + depth))
+        if saturated:
+            # never grow while saturated; shed idle processes down to what's busy
+            target = max(self.min_concurrency, min(procs, active))
+
+        scaled = False
+        if target > procs:
+            self.scale_up(target - procs)
+            scaled = True
+        elif target < procs:
+            self.scale_down(procs - target)
+            scaled = True
+
+        # after scaling, which may itself have moved the prefetch count
+        prefetch = self._set_prefetch(1 if saturated else max(1, target * self.worker.app.conf.worker_prefetch_multiplier))
+
+        self._publish({
+            "processes": self.processes,
+            "target": target,
+            "active": active,
+            "queue_depth": depth,
+            "saturated": saturated,
+            "prefetch": prefetch,
+            "mem_available_mb": mem_mb,
+            "min_concurrency": self.min_concurrency,
+            "max_concurrency": self.max_concurrency,
+            "updated_at": time.time(),
+        })
+        return scaled
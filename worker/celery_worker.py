@@ -1,9 +1,34 @@
 # worker/celery_worker.py
-import os
+# Worker supervisor entrypoint:
+#   python -m worker.celery_worker [extra celery worker args]
+# Sizes concurrency from host cores, available memory and the per-sandbox
+# limits in app.config, then starts celery with QueueDepthAutoscaler.
+import sys
+import json
+import logging
+
 from app.tasks import celery
+from worker.autoscale import host_sizing
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None):
+    sizing = host_sizing()
+    logger.info("worker sizing: %s", json.dumps(sizing))
+
+    celery.conf.worker_autoscaler = "worker.autoscale:QueueDepthAutoscaler"
+    # one task per process at a time so the autoscaler, not prefetch, controls intake
+    celery.conf.worker_prefetch_multiplier = 1
+
+    celery.worker_main([
+        "worker",
+        "--loglevel=info",
+        f"--autoscale={sizing['max_concurrency']},{sizing['min_concurrency']}",
+        *(argv if argv is not None else sys.argv[1:]),
+    ])
+
 
 if __name__ == "__main__":
-    # This file is the worker entrypoint. In Dockerfile or commandline, run:
-    # python -m worker.celery_worker
-    # or directly start celery: celery -A app.tasks worker --loglevel=info
-    print("Worker entrypoint. Use celery CLI to run the worker.")
+    logging.basicConfig(level=logging.INFO)
+    main()